@@ -11,7 +11,8 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
+from sklearn.model_selection import train_test_split, StratifiedKFold, GridSearchCV
+from sklearn.base import clone
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, VotingClassifier
 from sklearn.svm import SVC
@@ -20,13 +21,20 @@ from sklearn.naive_bayes import GaussianNB
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.neural_network import MLPClassifier
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score, precision_score, recall_score, f1_score
+from sklearn.isotonic import IsotonicRegression
+from sklearn.calibration import calibration_curve
+from scipy.stats import chi2
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score, precision_score, recall_score, f1_score, brier_score_loss
 import joblib
 import os
 import warnings
 import sys
 import urllib.request
 import time
+import bisect
+import math
+import threading
+from collections import deque
 from datetime import datetime
 
 warnings.filterwarnings('ignore')
@@ -46,11 +54,14 @@ mail = Mail(app)
 # Global variables
 best_model = None
 best_scaler = None
+best_calibration = None
 model_results = {}
 feature_names = [
     'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 
     'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'
 ]
+numeric_features = ['age', 'trestbps', 'chol', 'thalach', 'oldpeak']
+categorical_features = ['sex', 'cp', 'fbs', 'restecg', 'exang', 'slope', 'ca', 'thal']
 
 def download_uci_dataset():
     """Download the actual UCI Heart Disease dataset"""
@@ -113,6 +124,12 @@ def load_uci_dataset():
         print(f"❌ Error loading dataset: {e}")
         raise
 
+def split_dataset(df):
+    """Split the dataset into the train/test partitions used for model comparison"""
+    X = df[feature_names]
+    y = df['target']
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
 def get_ml_models():
     """Define and return all ML models to test"""
     models = {
@@ -127,6 +144,20 @@ def get_ml_models():
     }
     return models
 
+def out_of_fold_predictions(model, X, y, n_splits=5):
+    """Cross-validate a model, returning out-of-fold probabilities and per-fold accuracy"""
+    X = np.asarray(X)
+    y = np.asarray(y)
+    oof_proba = np.zeros(len(y))
+    fold_scores = []
+    
+    for train_idx, val_idx in StratifiedKFold(n_splits=n_splits).split(X, y):
+        fold_model = clone(model).fit(X[train_idx], y[train_idx])
+        oof_proba[val_idx] = fold_model.predict_proba(X[val_idx])[:, 1]
+        fold_scores.append(accuracy_score(y[val_idx], fold_model.predict(X[val_idx])))
+    
+    return oof_proba, np.array(fold_scores)
+
 def evaluate_model(model, X_train, X_test, y_train, y_test, model_name):
     """Comprehensive model evaluation"""
     print(f"🔍 Evaluating {model_name}...")
@@ -151,8 +182,8 @@ def evaluate_model(model, X_train, X_test, y_train, y_test, model_name):
     # ROC AUC (if probabilities available)
     roc_auc = roc_auc_score(y_test, y_pred_proba) if y_pred_proba is not None else None
     
-    # Cross-validation score
-    cv_scores = cross_val_score(model, X_train, y_train, cv=5, scoring='accuracy')
+    # Cross-validation score (out-of-fold probabilities are kept for calibration)
+    oof_proba, cv_scores = out_of_fold_predictions(model, X_train, y_train)
     cv_mean = cv_scores.mean()
     cv_std = cv_scores.std()
     
@@ -178,6 +209,7 @@ def evaluate_model(model, X_train, X_test, y_train, y_test, model_name):
         },
         'sensitivity': tp / (tp + fn) if (tp + fn) > 0 else 0,  # Recall
         'specificity': tn / (tn + fp) if (tn + fp) > 0 else 0,
+        'oof_proba': oof_proba,
         'model_object': model
     }
     
@@ -207,7 +239,7 @@ def create_ensemble_model(models, X_train, y_train):
 
 def train_and_compare_models():
     """Train multiple models and compare their performance"""
-    global best_model, best_scaler, model_results
+    global best_model, best_scaler, best_calibration, model_results
     
     print("🔄 Training and comparing multiple ML models...")
     print("=" * 80)
@@ -215,14 +247,11 @@ def train_and_compare_models():
     # Load dataset
     df = load_uci_dataset()
     
-    # Prepare features and target
-    X = df[feature_names]
+    # Prepare target
     y = df['target']
     
     # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    X_train, X_test, y_train, y_test = split_dataset(df)
     
     # Scale features
     scaler = StandardScaler()
@@ -274,6 +303,8 @@ def train_and_compare_models():
     best_result = results[0]
     best_model = best_result['model_object']
     best_scaler = scaler
+    best_calibration = fit_probability_calibration(best_model, X_train_scaled, best_result['oof_proba'], y_train)
+    best_calibration['test_metrics'] = evaluate_calibrated_model(best_calibration, best_model, X_test_scaled, y_test)
     
     # Store results for API
     model_results = {
@@ -285,7 +316,9 @@ def train_and_compare_models():
             'features': len(feature_names),
             'positive_cases': int(y.sum()),
             'negative_cases': int(len(y) - y.sum())
-        }
+        },
+        'reference_profile': build_reference_profile(X_train),
+        'calibration': best_calibration
     }
     
     print("=" * 80)
@@ -299,6 +332,8 @@ def train_and_compare_models():
     print(f"   Cross-Val: {best_result['cv_mean']:.4f}±{best_result['cv_std']:.4f}")
     print(f"   Sensitivity: {best_result['sensitivity']:.4f}")
     print(f"   Specificity: {best_result['specificity']:.4f}")
+    print(f"   Calibration: {best_calibration['method']} "
+          f"(Brier {best_calibration['brier_raw']:.4f} → {best_calibration['brier_calibrated']:.4f})")
     print("=" * 80)
     
     # Display top 5 models comparison
@@ -326,6 +361,463 @@ def train_and_compare_models():
     
     return best_result['accuracy']
 
+# === Probability Calibration ===
+# Risk bands used when no calibration is available (raw predict_proba outputs)
+DEFAULT_RISK_THRESHOLDS = {'decision': 0.5, 'high': 0.7, 'moderate': 0.4, 'urgent': 0.8, 'reassure': 0.2}
+
+# Calibrated probabilities at or above this are predicted as heart disease
+DECISION_THRESHOLD = 0.5
+
+# Sensitivity targets set the lower cutoffs, specificity targets the upper ones
+RISK_BAND_TARGETS = {
+    'moderate': ('sensitivity', 0.90),   # >= moderate catches 90% of disease cases
+    'high': ('specificity', 0.90),       # >= high flags at most 10% of healthy patients
+    'reassure': ('sensitivity', 0.95),   # below this, 95% of disease cases are still flagged
+    'urgent': ('specificity', 0.95)      # >= urgent flags at most 5% of healthy patients
+}
+CALIBRATION_METHODS = ['isotonic', 'platt']
+CALIBRATION_GRID_SIZE = 1001
+CALIBRATION_PROBE_ROWS = 20
+
+def threshold_for_sensitivity(y, proba, target):
+    """Highest cutoff whose flagged set (proba >= cutoff) keeps sensitivity at or above target"""
+    positives = np.sort(proba[y == 1])
+    allowed_misses = int(np.floor((1 - target) * len(positives) + 1e-9))
+    return float(positives[min(allowed_misses, len(positives) - 1)])
+
+def threshold_for_specificity(y, proba, target):
+    """Lowest cutoff whose unflagged set (proba < cutoff) keeps specificity at or above target"""
+    negatives = np.sort(proba[y == 0])
+    required = int(np.ceil(target * len(negatives) - 1e-9))
+    return float(np.nextafter(negatives[max(required, 1) - 1], np.inf))
+
+def select_risk_thresholds(y, proba):
+    """Pick risk-band cutoffs on calibrated probabilities for the sensitivity/specificity targets"""
+    thresholds = {}
+    for band, (metric, target) in RISK_BAND_TARGETS.items():
+        if metric == 'sensitivity':
+            thresholds[band] = threshold_for_sensitivity(y, proba, target)
+        else:
+            thresholds[band] = threshold_for_specificity(y, proba, target)
+    
+    # Keep the bands ordered (reassure <= moderate <= decision <= high <= urgent) so the
+    # risk band never contradicts the prediction; this only moves cutoffs past their targets
+    thresholds['decision'] = DECISION_THRESHOLD
+    thresholds['moderate'] = min(thresholds['moderate'], DECISION_THRESHOLD)
+    thresholds['high'] = max(thresholds['high'], DECISION_THRESHOLD)
+    thresholds['urgent'] = max(thresholds['urgent'], thresholds['high'])
+    thresholds['reassure'] = min(thresholds['reassure'], thresholds['moderate'])
+    return thresholds
+
+def _logit(proba):
+    proba = np.clip(proba, 1e-6, 1 - 1e-6)
+    return np.log(proba / (1 - proba)).reshape(-1, 1)
+
+def _fit_calibrator(method, proba, y):
+    """Fit a calibrator and return it as a lookup table over the raw probability grid"""
+    grid = np.linspace(0, 1, CALIBRATION_GRID_SIZE)
+    if method == 'isotonic':
+        calibrator = IsotonicRegression(out_of_bounds='clip', y_min=0.0, y_max=1.0).fit(proba, y)
+        return grid, calibrator.predict(grid)
+    # Platt scaling: unregularized sigmoid on the log-odds
+    calibrator = LogisticRegression(C=np.inf).fit(_logit(proba), y)
+    return grid, calibrator.predict_proba(_logit(grid))[:, 1]
+
+def fit_probability_calibration(model, X, oof_proba, y):
+    """Fit isotonic or Platt calibration on out-of-fold probabilities and choose risk thresholds"""
+    print("🎯 Calibrating probabilities on out-of-fold predictions...")
+    oof_proba = np.asarray(oof_proba, dtype=float)
+    y = np.asarray(y)
+    
+    # Choose the method with the lowest cross-validated Brier score
+    folds = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+    cv_calibrated = {}
+    for method in CALIBRATION_METHODS:
+        calibrated = np.zeros(len(y))
+        for train_idx, val_idx in folds.split(oof_proba, y):
+            grid, values = _fit_calibrator(method, oof_proba[train_idx], y[train_idx])
+            calibrated[val_idx] = np.interp(oof_proba[val_idx], grid, values)
+        cv_calibrated[method] = calibrated
+        print(f"   {method}: Brier {brier_score_loss(y, calibrated):.4f}")
+    
+    method = min(cv_calibrated, key=lambda m: brier_score_loss(y, cv_calibrated[m]))
+    grid, values = _fit_calibrator(method, oof_proba, y)
+    # Thresholds come from held-out calibrated probabilities, not the ones the table was fitted on
+    thresholds = select_risk_thresholds(y, cv_calibrated[method])
+    
+    def reliability(proba):
+        prob_true, prob_pred = calibration_curve(y, proba, n_bins=10)
+        return {'mean_predicted': prob_pred.tolist(), 'fraction_positive': prob_true.tolist()}
+    
+    # A few training rows and the model's raw outputs on them tie the calibration to this model
+    probe_inputs = np.asarray(X, dtype=float)[:CALIBRATION_PROBE_ROWS]
+    
+    return {
+        'model_class': type(model).__name__,
+        'probe_inputs': probe_inputs,
+        'probe_proba': model.predict_proba(probe_inputs)[:, 1],
+        'method': method,
+        'grid': grid,
+        'values': values,
+        'thresholds': thresholds,
+        'targets': {band: {'metric': m, 'target': t} for band, (m, t) in RISK_BAND_TARGETS.items()},
+        'brier_raw': float(brier_score_loss(y, oof_proba)),
+        'brier_calibrated': float(brier_score_loss(y, cv_calibrated[method])),
+        'reliability': {
+            'raw': reliability(oof_proba),
+            'calibrated': reliability(cv_calibrated[method])
+        },
+        'samples': int(len(y)),
+        'fitted_at': datetime.now().isoformat()
+    }
+
+def evaluate_calibrated_model(calibration, model, X_test, y_test):
+    """Test-split metrics for the served rule (calibrated probability >= decision cutoff)"""
+    y_test = np.asarray(y_test)
+    proba = np.interp(model.predict_proba(X_test)[:, 1], calibration['grid'], calibration['values'])
+    thresholds = calibration['thresholds']
+    y_pred = (proba >= thresholds['decision']).astype(int)
+    tn, fp, fn, tp = confusion_matrix(y_test, y_pred, labels=[0, 1]).ravel()
+    
+    bands = {}
+    for band, (metric, target) in RISK_BAND_TARGETS.items():
+        if metric == 'sensitivity':
+            achieved = np.mean(proba[y_test == 1] >= thresholds[band])
+        else:
+            achieved = np.mean(proba[y_test == 0] < thresholds[band])
+        bands[band] = {'metric': metric, 'target': target, 'achieved': float(achieved)}
+    
+    return {
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'precision': float(precision_score(y_test, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_test, y_pred, zero_division=0)),
+        'f1_score': float(f1_score(y_test, y_pred, zero_division=0)),
+        'sensitivity': float(tp / (tp + fn)) if (tp + fn) > 0 else 0.0,
+        'specificity': float(tn / (tn + fp)) if (tn + fp) > 0 else 0.0,
+        'brier': float(brier_score_loss(y_test, proba)),
+        'bands': bands,
+        'samples': int(len(y_test))
+    }
+
+def calibrate_probability(probability):
+    """Map a raw model probability through the precomputed calibration table"""
+    if best_calibration is None:
+        return probability
+    return float(np.interp(probability, best_calibration['grid'], best_calibration['values']))
+
+def calibration_matches_model(calibration):
+    """Check that a stored calibration was fitted for the currently loaded model"""
+    if not calibration or 'probe_inputs' not in calibration:
+        return False
+    if calibration.get('model_class') != type(best_model).__name__:
+        return False
+    try:
+        probe_proba = best_model.predict_proba(calibration['probe_inputs'])[:, 1]
+    except Exception:
+        return False
+    return bool(np.allclose(probe_proba, calibration['probe_proba']))
+
+def served_accuracy():
+    """Test accuracy of the rule predict() applies (calibrated when available)"""
+    if best_calibration is not None and 'test_metrics' in best_calibration:
+        return best_calibration['test_metrics']['accuracy']
+    return model_results['best_model']['accuracy']
+
+def get_risk_thresholds():
+    """Risk-band cutoffs for the current model"""
+    if best_calibration is None:
+        return DEFAULT_RISK_THRESHOLDS
+    return best_calibration['thresholds']
+
+# === Drift Monitoring ===
+# PSI/KS thresholds are minimum effect sizes; a feature must also be significant
+# at DRIFT_ALPHA (Bonferroni-corrected across features) for the current window size
+DRIFT_PSI_THRESHOLD = float(os.environ.get('DRIFT_PSI_THRESHOLD', 0.2))
+DRIFT_KS_THRESHOLD = float(os.environ.get('DRIFT_KS_THRESHOLD', 0.2))
+DRIFT_ALPHA = float(os.environ.get('DRIFT_ALPHA', 0.01))
+DRIFT_MIN_SAMPLES = int(os.environ.get('DRIFT_MIN_SAMPLES', 200))
+DRIFT_CHECK_SECONDS = float(os.environ.get('DRIFT_CHECK_SECONDS', 60))
+DRIFT_PSEUDO_COUNT = 0.5
+
+drift_lock = threading.Lock()
+drift_state = {}
+drift_checker = None
+
+def build_reference_profile(X):
+    """Summarize the training distribution of each feature for drift comparison"""
+    profile = {}
+    
+    # Numeric features are binned on training deciles
+    for feature in numeric_features:
+        values = X[feature].to_numpy(dtype=float)
+        edges = np.unique(np.quantile(values, np.linspace(0.1, 0.9, 9)))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        profile[feature] = {
+            'type': 'numeric',
+            'edges': [float(e) for e in edges],
+            'proportions': [float(c) for c in counts / len(values)],
+            'samples': int(len(values)),
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'q25': float(np.quantile(values, 0.25)),
+            'median': float(np.median(values)),
+            'q75': float(np.quantile(values, 0.75))
+        }
+    
+    # Categorical features keep the share of each observed category
+    for feature in categorical_features:
+        proportions = X[feature].value_counts(normalize=True).sort_index()
+        profile[feature] = {
+            'type': 'categorical',
+            'categories': [float(c) for c in proportions.index],
+            'proportions': [float(p) for p in proportions.values],
+            'samples': int(len(X)),
+            'mean': float(X[feature].mean()),
+            'mode': float(proportions.idxmax())
+        }
+    
+    return profile
+
+def reset_drift_monitor(profile=None):
+    """Start a fresh monitoring window against the given (or current) reference profile"""
+    global drift_state
+    
+    if profile is None:
+        profile = drift_state.get('reference')
+    if not profile:
+        return
+    
+    sketches = {}
+    for feature in feature_names:
+        reference = profile[feature]
+        sketch = {'count': 0, 'mean': 0.0, 'm2': 0.0, 'min': float('inf'), 'max': float('-inf')}
+        if reference['type'] == 'numeric':
+            sketch['edges'] = reference['edges']
+            sketch['bins'] = [0] * (len(reference['edges']) + 1)
+        else:
+            # Last bin collects categories never seen during training
+            sketch['index'] = {c: i for i, c in enumerate(reference['categories'])}
+            sketch['bins'] = [0] * (len(reference['categories']) + 1)
+        sketches[feature] = sketch
+    
+    with drift_lock:
+        drift_state = {
+            'reference': profile,
+            'sketches': sketches,
+            'samples': 0,
+            'checked_samples': 0,
+            'window_start': datetime.now().isoformat(),
+            'alerting': set(),
+            'alerts': deque(maxlen=50)
+        }
+
+def record_prediction_input(values):
+    """Update the streaming sketches with one request's feature values (runs on every prediction)"""
+    if not drift_state:
+        return
+    
+    with drift_lock:
+        sketches = drift_state['sketches']
+        for feature, value in zip(feature_names, values):
+            sketch = sketches[feature]
+            
+            # Welford running moments
+            n = sketch['count'] + 1
+            delta = value - sketch['mean']
+            sketch['mean'] += delta / n
+            sketch['m2'] += delta * (value - sketch['mean'])
+            sketch['count'] = n
+            if value < sketch['min']:
+                sketch['min'] = value
+            if value > sketch['max']:
+                sketch['max'] = value
+            
+            # Histogram / categorical counts
+            if 'edges' in sketch:
+                sketch['bins'][bisect.bisect_right(sketch['edges'], value)] += 1
+            else:
+                sketch['bins'][sketch['index'].get(value, len(sketch['bins']) - 1)] += 1
+        
+        drift_state['samples'] += 1
+
+def population_stability_index(expected_counts, actual_counts):
+    """PSI between two binned distributions given as counts, smoothing empty bins with pseudo-counts"""
+    expected_total = sum(expected_counts) + DRIFT_PSEUDO_COUNT * len(expected_counts)
+    actual_total = sum(actual_counts) + DRIFT_PSEUDO_COUNT * len(actual_counts)
+    psi = 0.0
+    for e, a in zip(expected_counts, actual_counts):
+        e = (e + DRIFT_PSEUDO_COUNT) / expected_total
+        a = (a + DRIFT_PSEUDO_COUNT) / actual_total
+        psi += (a - e) * math.log(a / e)
+    return psi
+
+def drift_critical_values(bins, samples, reference_samples):
+    """PSI and KS values that sampling noise alone exceeds with probability DRIFT_ALPHA"""
+    alpha = DRIFT_ALPHA / len(feature_names)
+    scale = 1 / samples + 1 / reference_samples
+    # Under no drift PSI is approximately chi-square with bins-1 dof, scaled by 1/n + 1/N
+    psi_critical = chi2.ppf(1 - alpha, bins - 1) * scale
+    ks_critical = math.sqrt(-math.log(alpha / 2) / 2) * math.sqrt(scale)
+    return max(DRIFT_PSI_THRESHOLD, float(psi_critical)), max(DRIFT_KS_THRESHOLD, ks_critical)
+
+def ks_statistic(expected, actual):
+    """Kolmogorov-Smirnov distance between two binned distributions"""
+    distance = 0.0
+    cum_expected = 0.0
+    cum_actual = 0.0
+    for e, a in zip(expected, actual):
+        cum_expected += e
+        cum_actual += a
+        distance = max(distance, abs(cum_expected - cum_actual))
+    return distance
+
+def sketch_quantile(edges, bins, low, high, q):
+    """Approximate a quantile from histogram counts by interpolating inside the bin"""
+    target = q * sum(bins)
+    bounds = [low] + list(edges) + [high]
+    cumulative = 0
+    for i, count in enumerate(bins):
+        if count and cumulative + count >= target:
+            left = max(bounds[i], low)
+            right = min(bounds[i + 1], high)
+            return left + (right - left) * (target - cumulative) / count
+        cumulative += count
+    return high
+
+def compute_drift_report():
+    """Compare the live sketches with the training reference profile"""
+    with drift_lock:
+        reference = drift_state['reference']
+        samples = drift_state['samples']
+        window_start = drift_state['window_start']
+        alerts = list(drift_state['alerts'])
+        snapshot = {
+            feature: dict(sketch, bins=list(sketch['bins']))
+            for feature, sketch in drift_state['sketches'].items()
+        }
+    
+    features = {}
+    for feature in feature_names:
+        ref = reference[feature]
+        sketch = snapshot[feature]
+        count = sketch['count']
+        
+        live_stats = {
+            'count': count,
+            'mean': sketch['mean'] if count else None,
+            'std': math.sqrt(sketch['m2'] / count) if count else None,
+            'min': sketch['min'] if count else None,
+            'max': sketch['max'] if count else None
+        }
+        
+        if ref['type'] == 'numeric':
+            expected = ref['proportions']
+            if count:
+                for name, q in [('q25', 0.25), ('median', 0.5), ('q75', 0.75)]:
+                    live_stats[name] = sketch_quantile(ref['edges'], sketch['bins'], sketch['min'], sketch['max'], q)
+            training_stats = {k: ref[k] for k in ['mean', 'std', 'q25', 'median', 'q75']}
+        else:
+            expected = ref['proportions'] + [0.0]
+            training_stats = {'mean': ref['mean'], 'mode': ref['mode']}
+        
+        psi = ks = psi_critical = ks_critical = None
+        if count:
+            actual = [c / count for c in sketch['bins']]
+            psi = population_stability_index([p * ref['samples'] for p in expected], sketch['bins'])
+            psi_critical, ks_critical = drift_critical_values(len(expected), count, ref['samples'])
+            if ref['type'] == 'numeric':
+                ks = ks_statistic(expected, actual)
+            else:
+                ks_critical = None
+        
+        drifted = bool(
+            samples >= DRIFT_MIN_SAMPLES and psi is not None and
+            (psi >= psi_critical or (ks is not None and ks >= ks_critical))
+        )
+        
+        features[feature] = {
+            'type': ref['type'],
+            'psi': psi,
+            'ks': ks,
+            'psi_critical': psi_critical,
+            'ks_critical': ks_critical,
+            'drifted': drifted,
+            'live': live_stats,
+            'training': training_stats
+        }
+    
+    psi_values = [f['psi'] for f in features.values() if f['psi'] is not None]
+    return {
+        'samples': samples,
+        'window_start': window_start,
+        'min_samples': DRIFT_MIN_SAMPLES,
+        'thresholds': {'psi': DRIFT_PSI_THRESHOLD, 'ks': DRIFT_KS_THRESHOLD, 'alpha': DRIFT_ALPHA},
+        'drift_detected': any(f['drifted'] for f in features.values()),
+        'drifted_features': [name for name, f in features.items() if f['drifted']],
+        'max_psi': max(psi_values) if psi_values else None,
+        'features': features,
+        'alerts': alerts
+    }
+
+def check_drift_alerts():
+    """Raise an alert for each feature that newly crosses a drift threshold"""
+    report = compute_drift_report()
+    drifted = set(report['drifted_features'])
+    new_alerts = []
+    
+    # Compare and swap the alerting set in one step, ignoring reports that are
+    # stale (older than the last check) or belong to a window that was reset
+    with drift_lock:
+        if (report['window_start'] != drift_state['window_start'] or
+                report['samples'] < drift_state['checked_samples']):
+            return report
+        drift_state['checked_samples'] = report['samples']
+        new_features = drifted - drift_state['alerting']
+        drift_state['alerting'] = drifted
+        for feature in sorted(new_features):
+            scores = report['features'][feature]
+            alert = {
+                'feature': feature,
+                'psi': scores['psi'],
+                'ks': scores['ks'],
+                'samples': report['samples'],
+                'timestamp': datetime.now().isoformat()
+            }
+            drift_state['alerts'].append(alert)
+            new_alerts.append(alert)
+    
+    for alert in new_alerts:
+        ks_display = f"{alert['ks']:.3f}" if alert['ks'] is not None else "N/A"
+        print(f"🚨 Drift alert: {alert['feature']} (PSI: {alert['psi']:.3f}, KS: {ks_display}) "
+              f"after {alert['samples']} requests")
+    
+    return report
+
+def start_drift_checker():
+    """Run drift alert checks on a background thread so predictions never pay for them"""
+    global drift_checker
+    
+    if drift_checker is not None:
+        return
+    
+    def run():
+        last_checked = None
+        while True:
+            time.sleep(DRIFT_CHECK_SECONDS)
+            if not drift_state:
+                continue
+            window = (drift_state['window_start'], drift_state['samples'])
+            if window[1] < DRIFT_MIN_SAMPLES or window == last_checked:
+                continue
+            try:
+                check_drift_alerts()
+            except Exception as e:
+                print(f"⚠️ Drift check failed: {e}")
+            last_checked = window
+    
+    drift_checker = threading.Thread(target=run, name='drift-checker', daemon=True)
+    drift_checker.start()
+
 def validate_input(data):
     """Validate input data based on UCI dataset ranges"""
     missing = [f for f in feature_names if f not in data or data[f] is None]
@@ -419,7 +911,10 @@ def home():
         'endpoints': {
             'predict': 'POST /api/predict/kb22',
             'model_info': 'GET /api/model/info',
-            'model_comparison': 'GET /api/model/comparison'
+            'model_comparison': 'GET /api/model/comparison',
+            'calibration': 'GET /api/model/calibration',
+            'drift': 'GET /api/monitoring/drift',
+            'drift_reset': 'POST /api/monitoring/drift/reset'
         }
     })
 
@@ -444,6 +939,9 @@ def model_info():
         },
         'dataset_info': model_results['dataset_info'],
         'comparison_timestamp': model_results['comparison_timestamp'],
+        'calibration_method': best_calibration['method'] if best_calibration else None,
+        'served_metrics': best_calibration.get('test_metrics') if best_calibration else None,
+        'risk_thresholds': get_risk_thresholds(),
         'features': feature_names,
         'feature_descriptions': {
             'age': 'Age in years',
@@ -495,6 +993,25 @@ def model_comparison():
         'total_models_tested': len(comparison_data)
     })
 
+@app.route('/api/model/calibration')
+def model_calibration():
+    """Get calibration method, risk thresholds and cached reliability curves"""
+    if best_calibration is None:
+        return jsonify({'error': 'Calibration not available'}), 500
+    
+    return jsonify({
+        'model_name': model_results['best_model']['model_name'],
+        'method': best_calibration['method'],
+        'thresholds': best_calibration['thresholds'],
+        'targets': best_calibration['targets'],
+        'brier_raw': best_calibration['brier_raw'],
+        'brier_calibrated': best_calibration['brier_calibrated'],
+        'reliability': best_calibration['reliability'],
+        'test_metrics': best_calibration.get('test_metrics'),
+        'samples': best_calibration['samples'],
+        'fitted_at': best_calibration['fitted_at']
+    })
+
 @app.route('/api/dataset/statistics')
 def dataset_statistics():
     """Get dataset statistics for visualization"""
@@ -502,10 +1019,6 @@ def dataset_statistics():
         # Load dataset
         df = load_uci_dataset()
         
-        # Calculate statistics for each feature
-        numeric_features = ['age', 'trestbps', 'chol', 'thalach', 'oldpeak']
-        categorical_features = ['sex', 'cp', 'fbs', 'restecg', 'exang', 'slope', 'ca', 'thal']
-        
         statistics = {}
         
         # Calculate statistics for numeric features
@@ -543,6 +1056,23 @@ def dataset_statistics():
         print(f"Error getting dataset statistics: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/monitoring/drift')
+def drift_monitoring():
+    """Get drift scores of live prediction inputs against the training distribution"""
+    if not drift_state:
+        return jsonify({'error': 'Drift monitor not initialized'}), 500
+    
+    return jsonify(compute_drift_report())
+
+@app.route('/api/monitoring/drift/reset', methods=['POST'])
+def drift_monitoring_reset():
+    """Discard the current monitoring window and start a new one"""
+    if not drift_state:
+        return jsonify({'error': 'Drift monitor not initialized'}), 500
+    
+    reset_drift_monitor()
+    return jsonify({'status': 'success', 'window_start': drift_state['window_start']})
+
 @app.route('/api/predict/kb22', methods=['POST'])
 def predict():
     """Main prediction endpoint using best model"""
@@ -565,20 +1095,32 @@ def predict():
         validate_input(data)
         
         # Prepare input for prediction
-        input_array = np.array([[float(data[feature]) for feature in feature_names]])
+        input_values = [float(data[feature]) for feature in feature_names]
+        input_array = np.array([input_values])
         input_scaled = best_scaler.transform(input_array)
         
+        # Update drift sketches (never let monitoring break a prediction)
+        try:
+            record_prediction_input(input_values)
+        except Exception as e:
+            print(f"⚠️ Drift monitor update failed: {e}")
+        
         # Make prediction
         prediction = best_model.predict(input_scaled)[0]
-        probabilities = best_model.predict_proba(input_scaled)[0] if hasattr(best_model, 'predict_proba') else [1-prediction, prediction]
+        raw_probabilities = best_model.predict_proba(input_scaled)[0] if hasattr(best_model, 'predict_proba') else [1-prediction, prediction]
         
+        # Calibrate via lookup table; the calibrated probability also decides the class
+        thresholds = get_risk_thresholds()
+        heart_disease_prob = calibrate_probability(raw_probabilities[1])
+        if best_calibration is not None:
+            prediction = int(heart_disease_prob >= thresholds['decision'])
+        probabilities = [1 - heart_disease_prob, heart_disease_prob]
         confidence = probabilities[prediction]
-        heart_disease_prob = probabilities[1]
         
         # Determine risk level
-        if heart_disease_prob >= 0.7:
+        if heart_disease_prob >= thresholds['high']:
             risk_level = 'High Risk'
-        elif heart_disease_prob >= 0.4:
+        elif heart_disease_prob >= thresholds['moderate']:
             risk_level = 'Moderate Risk'
         else:
             risk_level = 'Low Risk'
@@ -586,18 +1128,21 @@ def predict():
         result = {
             'prediction': int(prediction),
             'probability': float(heart_disease_prob),
+            'raw_probability': float(raw_probabilities[1]),
             'confidence': float(confidence),
             'probabilities': {
                 'no_heart_disease': float(probabilities[0]),
                 'heart_disease': float(probabilities[1])
             },
             'risk_level': risk_level,
+            'risk_thresholds': thresholds,
             'recommendation': get_recommendation(prediction, heart_disease_prob),
             'status': 'success',
             'model_info': {
                 'algorithm': model_results['best_model']['model_name'],
-                'accuracy': f"{model_results['best_model']['accuracy']*100:.2f}%",
+                'accuracy': f"{served_accuracy()*100:.2f}%",
                 'dataset': 'UCI Heart Disease',
+                'calibration': best_calibration['method'] if best_calibration else 'none',
                 'trained_on': f"{model_results['dataset_info']['samples']} real patient records"
             }
         }
@@ -623,20 +1168,21 @@ def predict():
 
 def get_recommendation(prediction, probability):
     """Generate recommendations based on prediction"""
+    thresholds = get_risk_thresholds()
     if prediction == 1:
-        if probability >= 0.8:
+        if probability >= thresholds['urgent']:
             return "High risk detected. Please consult a cardiologist immediately for further evaluation."
         else:
             return "Moderate to high risk detected. Please schedule an appointment with your doctor soon."
     else:
-        if probability <= 0.2:
+        if probability < thresholds['reassure']:
             return "Low risk detected. Continue maintaining a healthy lifestyle."
         else:
             return "Low to moderate risk. Consider regular health check-ups and lifestyle improvements."
 
 def initialize():
     """Initialize the system with model comparison"""
-    global best_model, best_scaler, model_results
+    global best_model, best_scaler, best_calibration, model_results
     
     print("\n🚀 Initializing KB22 Enhanced Heart Disease Prediction API...")
     print("🤖 Multi-Algorithm Comparison System")
@@ -675,6 +1221,42 @@ def initialize():
             print("Please check your internet connection for dataset download.")
             sys.exit(1)
     
+    # Calibration is stored with the comparison results; refit it from the best model's
+    # out-of-fold predictions when it is missing or was fitted for a different model
+    best_calibration = model_results.get('calibration')
+    if calibration_matches_model(best_calibration):
+        print(f"✅ Loaded {best_calibration['method']} probability calibration")
+    else:
+        try:
+            X_train, X_test, y_train, y_test = split_dataset(load_uci_dataset())
+            X_train_scaled = best_scaler.transform(X_train)
+            oof_proba, _ = out_of_fold_predictions(best_model, X_train_scaled, y_train)
+            best_calibration = fit_probability_calibration(best_model, X_train_scaled, oof_proba, y_train)
+            best_calibration['test_metrics'] = evaluate_calibrated_model(
+                best_calibration, best_model, best_scaler.transform(X_test), y_test
+            )
+            model_results['calibration'] = best_calibration
+            joblib.dump(model_results, 'kb22_model_comparison.pkl')
+        except Exception as e:
+            print(f"⚠️ Could not prepare probability calibration, using raw probabilities: {e}")
+            best_calibration = None
+    
+    # Reference profile for drift monitoring (older comparison files predate it)
+    if 'reference_profile' not in model_results:
+        try:
+            print("📐 Building training reference profile for drift monitoring...")
+            X_train, _, _, _ = split_dataset(load_uci_dataset())
+            model_results['reference_profile'] = build_reference_profile(X_train)
+            joblib.dump(model_results, 'kb22_model_comparison.pkl')
+        except Exception as e:
+            print(f"⚠️ Could not build drift reference profile: {e}")
+    
+    if 'reference_profile' in model_results:
+        reset_drift_monitor(model_results['reference_profile'])
+        start_drift_checker()
+        print(f"📡 Drift monitoring enabled (PSI alert ≥ {DRIFT_PSI_THRESHOLD}, KS alert ≥ {DRIFT_KS_THRESHOLD}, "
+              f"α={DRIFT_ALPHA}, min {DRIFT_MIN_SAMPLES} requests, checked every {DRIFT_CHECK_SECONDS:.0f}s)")
+    
     print("=" * 80)
     print("🎯 KB22 Enhanced API ready!")
     print(f"🏆 Best Model: {model_results['best_model']['model_name']}")
@@ -140,6 +140,7 @@ function App() {
         model: result.model_info?.algorithm || "Enhanced Model",
         accuracy: result.model_info?.accuracy || "N/A",
         risk_level: result.risk_level,
+        risk_thresholds: result.risk_thresholds,
         recommendation: result.recommendation,
         risk:
           result.prediction === 1
@@ -444,6 +445,8 @@ function App() {
     const cp = Number(formData.cp);
     const riskLevel = (prediction.risk_level || '').toLowerCase();
     const riskProbability = prediction.probability || 0;
+    const urgentThreshold = prediction.risk_thresholds?.urgent ?? 0.75;
+    const highThreshold = prediction.risk_thresholds?.high ?? 0.55;
 
     // Baseline actions based on model output
     if (prediction.prediction === 1 || riskLevel.includes('high')) {
@@ -456,10 +459,10 @@ function App() {
       pushTip('Maintain stress-reduction routines (mindfulness, deep breathing, yoga) and target 7–8 hours of quality sleep.');
     }
 
-    if (riskProbability >= 0.75) {
+    if (riskProbability >= urgentThreshold) {
       pushTip('Discuss advanced diagnostics (stress test, echocardiogram, or coronary CT) with your cardiologist given the elevated predicted risk.');
       pushTip('Review current medications with your physician; aggressive risk-factor management may be indicated.');
-    } else if (riskProbability >= 0.55) {
+    } else if (riskProbability >= highThreshold) {
       pushTip('Track blood pressure, resting heart rate, and symptoms weekly; share the log at your next clinical visit.');
     }
 
@@ -1122,7 +1125,7 @@ function App() {
                   {Math.round(prediction.probability * 100)}% Probability
                 </p>
                 <div className="mt-4 flex items-center justify-center">
-                  <RiskGauge score={prediction.probability} label="Your Risk Score" size={120} />
+                  <RiskGauge score={prediction.probability} thresholds={prediction.risk_thresholds} label="Your Risk Score" size={120} />
                 </div>
               </div>
 
@@ -6,14 +6,17 @@ import React from 'react';
  *   - score: number (0..1, required)
  *   - label: string (optional, e.g., 'Your Risk Score')
  *   - size: number (optional, px, default 160)
+ *   - thresholds: object (optional, { high, moderate } cutoffs from the prediction API)
  */
-const RiskGauge = ({ score = 0, label = '', size = 160 }) => {
+const RiskGauge = ({ score = 0, label = '', size = 160, thresholds }) => {
   // Clamp and interpret risk
   const safeScore = Math.max(0, Math.min(1, parseFloat(score) || 0));
   const pct = safeScore * 100;
+  const high = thresholds?.high ?? 0.7;
+  const moderate = thresholds?.moderate ?? 0.4;
   let riskLevel = 'Low', color = '#22c55e';
-  if (pct >= 70) { riskLevel = 'High'; color = '#ef4444'; }
-  else if (pct >= 40) { riskLevel = 'Medium'; color = '#f59e42'; color = '#facc15'; } // Yellow
+  if (safeScore >= high) { riskLevel = 'High'; color = '#ef4444'; }
+  else if (safeScore >= moderate) { riskLevel = 'Medium'; color = '#f59e42'; color = '#facc15'; } // Yellow
 
   // SVG Gauge dimensions
   const stroke = 18;